@@ -1,31 +1,130 @@
 from __future__ import annotations
+import os
 from pathlib import Path
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, inspect, text
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+
+# Connection-level tuning: WAL lets the search queries read while a save
+# commits, NORMAL synchronous batches fsyncs at WAL checkpoints, and the
+# cache/mmap sizes keep hot pages out of the syscall path.
+_PRAGMAS = (
+    "journal_mode=WAL",
+    "synchronous=NORMAL",
+    "temp_store=MEMORY",
+    "mmap_size=268435456",
+    "cache_size=-20000",
+    "busy_timeout=5000",
+    "foreign_keys=ON",
+)
+
+# journal_mode is a property of the file and needs write access; read-only
+# connections inherit whatever the writer set.
+_RO_PRAGMAS = tuple(p for p in _PRAGMAS if not p.startswith("journal_mode"))
+
+def _set_pragmas(dbapi_conn, _record, _pragmas=_PRAGMAS):
+    cur = dbapi_conn.cursor()
+    for p in _pragmas:
+        cur.execute("PRAGMA " + p)
+    cur.close()
+
+def _set_ro_pragmas(dbapi_conn, _record):
+    _set_pragmas(dbapi_conn, _record, _RO_PRAGMAS)
+
+def _optimize_on_close(dbapi_conn, _record):
+    # Keeps sqlite_stat1 fresh so the planner keeps picking indexes as the
+    # table grows; self-limiting since SQLite 3.46, so cheap on small DBs.
+    try:
+        dbapi_conn.execute("PRAGMA optimize")
+    except Exception:
+        pass
 
 def make_engine(db_path: Path):
     # SQLite DB file; check_same_thread=False so Qt threads won't choke.
-    return create_engine(
+    engine = create_engine(
         f"sqlite:///{db_path}",
         future=True,
         connect_args={"check_same_thread": False}
     )
+    if str(db_path) != ":memory:":
+        # Fires for every pooled connection, not just the first one.
+        event.listen(engine, "connect", _set_pragmas)
+        event.listen(engine, "close", _optimize_on_close)
+    return engine
+
+def make_engines(db_path: Path):
+    """Dual pool over the same file: one writer + N readers.
+
+    Under WAL the readers never block the writer, so a debounced search
+    refresh can run while a save commits instead of serializing on a
+    single shared connection.
+    """
+    url = f"sqlite:///{db_path}"
+    rw_engine = create_engine(
+        url, future=True,
+        poolclass=QueuePool, pool_size=1, max_overflow=0,
+        connect_args={"check_same_thread": False},
+    )
+    # Listeners go on before anything connects: with a single pooled
+    # writer connection, a pre-listener connect would live out the whole
+    # process without the pragmas (no WAL, no foreign_keys).
+    if str(db_path) != ":memory:":
+        event.listen(rw_engine, "connect", _set_pragmas)
+        event.listen(rw_engine, "close", _optimize_on_close)
+
+    # Writer takes the lock up front so it queues behind busy_timeout
+    # instead of failing with SQLITE_BUSY at commit time.
+    @event.listens_for(rw_engine, "connect")
+    def _autocommit_off(dbapi_conn, _record):
+        dbapi_conn.isolation_level = None
+
+    @event.listens_for(rw_engine, "begin")
+    def _begin_immediate(conn):
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+    if str(db_path) != ":memory:":
+        if not Path(db_path).exists():
+            # mode=ro can't create the file; let the writer do it first.
+            with rw_engine.connect():
+                pass
+        # Readers skip write-lock acquisition and WAL-index contention
+        # entirely; cache=private, never shared.  uri=true in the URL query
+        # tells the dialect to hand the rest through as a SQLite URI.
+        ro_engine = create_engine(
+            f"sqlite:///file:{db_path}?mode=ro&cache=private&uri=true", future=True,
+            poolclass=QueuePool, pool_size=os.cpu_count() or 2,
+            connect_args={"check_same_thread": False},
+        )
+        event.listen(ro_engine, "connect", _set_ro_pragmas)
+    else:
+        ro_engine = create_engine(
+            url, future=True,
+            poolclass=QueuePool, pool_size=os.cpu_count() or 2,
+            connect_args={"check_same_thread": False},
+        )
+
+    return rw_engine, ro_engine
 
 def make_session_factory(engine):
     # expire_on_commit=False keeps objects usable after commit
     return sessionmaker(bind=engine, autoflush=False, expire_on_commit=False, future=True)
 
+def make_session_factories(rw_engine, ro_engine):
+    # (write factory, read factory) — route create/update/delete through
+    # the first and list/get through the second.
+    return make_session_factory(rw_engine), make_session_factory(ro_engine)
+
 def init_db(engine, Base):
     Base.metadata.create_all(engine)
 
     # Older installations may lack the ``created_at`` and ``updated_at`` columns.
     # SQLite doesn't support automatic schema migrations, so we ensure the
     # columns exist manually.  ``datetime('now')`` matches the server_default
-    # used in the SQLAlchemy model definition.
+    # used in the SQLAlchemy model definition.  The Inspector reads the whole
+    # reflected schema in one round trip (and on a fresh install create_all
+    # just made the columns, so both ALTERs are skipped).
+    columns = {c["name"] for c in inspect(engine).get_columns("patients")}
     with engine.begin() as conn:
-        columns = {
-            row[1] for row in conn.execute(text("PRAGMA table_info(patients)"))
-        }
         if "created_at" not in columns:
             conn.execute(
                 text(
@@ -38,3 +137,126 @@ def init_db(engine, Base):
                     "ALTER TABLE patients ADD COLUMN updated_at TEXT DEFAULT (datetime('now'))"
                 )
             )
+
+        # Serves the list view's ORDER BY last_name, first_name straight
+        # from the B-tree instead of a sort pass.
+        conn.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS ix_patients_name "
+                "ON patients(last_name COLLATE NOCASE, first_name COLLATE NOCASE)"
+            )
+        )
+
+        # Range scans for birth-date filters pushed down to SQL; the CIN
+        # prefix probe rides the unique CIN index.
+        conn.execute(
+            text("CREATE INDEX IF NOT EXISTS ix_patients_birth ON patients(birth_date)")
+        )
+
+        # SELECT DISTINCT phone/email (filter value lists) becomes an
+        # index-only scan instead of a table walk.
+        conn.execute(
+            text("CREATE INDEX IF NOT EXISTS ix_patients_phone ON patients(phone)")
+        )
+        conn.execute(
+            text("CREATE INDEX IF NOT EXISTS ix_patients_email ON patients(email)")
+        )
+
+        # Server-side updated_at: restricted to the data columns so the
+        # trigger's own write doesn't re-fire it (or the FTS sync trigger).
+        conn.execute(text(
+            "CREATE TRIGGER IF NOT EXISTS patients_updated_at "
+            "AFTER UPDATE OF cin, first_name, last_name, birth_date, phone, email, notes "
+            "ON patients BEGIN "
+            "UPDATE patients SET updated_at = datetime('now') WHERE id = new.id; END"
+        ))
+
+        _ensure_fts(conn)
+        _ensure_summary(conn)
+
+
+_FTS_COLS = "cin, first_name, last_name, phone, email, notes"
+
+def _ensure_fts(conn):
+    """External-content FTS5 table mirroring the searchable text columns.
+
+    Kept in sync by triggers so `PatientRepo.list` can answer the global
+    search with an index lookup instead of a 7-way OR of leading-wildcard
+    LIKEs (a guaranteed full scan).
+    """
+    exists = conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type='table' AND name='patients_fts'")
+    ).first()
+    conn.execute(text(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS patients_fts USING fts5("
+        f"{_FTS_COLS}, content='patients', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2')"
+    ))
+    new_vals = ", ".join(f"new.{c.strip()}" for c in _FTS_COLS.split(","))
+    old_vals = ", ".join(f"old.{c.strip()}" for c in _FTS_COLS.split(","))
+    conn.execute(text(
+        "CREATE TRIGGER IF NOT EXISTS patients_ai AFTER INSERT ON patients BEGIN "
+        f"INSERT INTO patients_fts(rowid, {_FTS_COLS}) VALUES (new.id, {new_vals}); END"
+    ))
+    conn.execute(text(
+        "CREATE TRIGGER IF NOT EXISTS patients_ad AFTER DELETE ON patients BEGIN "
+        f"INSERT INTO patients_fts(patients_fts, rowid, {_FTS_COLS}) "
+        f"VALUES ('delete', old.id, {old_vals}); END"
+    ))
+    # Recreate on upgrade: restricted to the indexed columns so the
+    # updated_at trigger's write doesn't force a pointless FTS resync.
+    conn.execute(text("DROP TRIGGER IF EXISTS patients_au"))
+    conn.execute(text(
+        f"CREATE TRIGGER patients_au AFTER UPDATE OF {_FTS_COLS} ON patients BEGIN "
+        f"INSERT INTO patients_fts(patients_fts, rowid, {_FTS_COLS}) "
+        f"VALUES ('delete', old.id, {old_vals}); "
+        f"INSERT INTO patients_fts(rowid, {_FTS_COLS}) VALUES (new.id, {new_vals}); END"
+    ))
+    if not exists:
+        # First run on a pre-existing DB: index the rows already there.
+        conn.execute(text("INSERT INTO patients_fts(patients_fts) VALUES ('rebuild')"))
+
+
+_SUMMARY_RECOMPUTE = (
+    "INSERT INTO patient_summary"
+    "(patient_id, first_session, last_session, total, attended, revenue) "
+    "SELECT {pid}, MIN(session_date), MAX(session_date), COUNT(*), "
+    "IFNULL(SUM(attended), 0), IFNULL(SUM(price), 0) "
+    "FROM sessions WHERE patient_id = {pid} "
+    "ON CONFLICT(patient_id) DO UPDATE SET "
+    "first_session=excluded.first_session, last_session=excluded.last_session, "
+    "total=excluded.total, attended=excluded.attended, revenue=excluded.revenue;"
+)
+
+def _ensure_summary(conn):
+    """Per-patient session aggregates materialized into patient_summary.
+
+    AFTER-triggers on sessions recompute the one affected patient's row,
+    so reading a patient's stats is a primary-key probe instead of an
+    aggregate scan over their sessions on every selection.
+    """
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS patient_summary("
+        "patient_id INTEGER PRIMARY KEY, "
+        "first_session TEXT, last_session TEXT, "
+        "total INTEGER NOT NULL DEFAULT 0, "
+        "attended INTEGER NOT NULL DEFAULT 0, "
+        "revenue REAL NOT NULL DEFAULT 0)"
+    ))
+    conn.execute(text(
+        "CREATE TRIGGER IF NOT EXISTS sessions_ai AFTER INSERT ON sessions BEGIN "
+        + _SUMMARY_RECOMPUTE.format(pid="new.patient_id") + " END"
+    ))
+    conn.execute(text(
+        "CREATE TRIGGER IF NOT EXISTS sessions_ad AFTER DELETE ON sessions BEGIN "
+        + _SUMMARY_RECOMPUTE.format(pid="old.patient_id") + " END"
+    ))
+    conn.execute(text(
+        "CREATE TRIGGER IF NOT EXISTS sessions_au AFTER UPDATE ON sessions BEGIN "
+        + _SUMMARY_RECOMPUTE.format(pid="old.patient_id") + " "
+        + _SUMMARY_RECOMPUTE.format(pid="new.patient_id") + " END"
+    ))
+    conn.execute(text(
+        "CREATE TRIGGER IF NOT EXISTS patients_summary_ad AFTER DELETE ON patients "
+        "BEGIN DELETE FROM patient_summary WHERE patient_id = old.id; END"
+    ))
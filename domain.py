@@ -12,3 +12,20 @@ class PatientDTO:
     phone: str | None
     email: str | None
     notes: str | None
+
+@dataclass
+class SessionDTO:
+    id: int | None
+    patient_id: int
+    session_date: date
+    price: float
+    attended: bool
+    notes: str | None
+
+@dataclass
+class PatientStatsDTO:
+    first_session: date | None
+    last_session: date | None
+    total_sessions: int
+    attendance_rate: float
+    total_revenue: float
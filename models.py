@@ -1,20 +1,41 @@
 from __future__ import annotations
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
-from sqlalchemy import String, Date, Text, func
+from sqlalchemy import Boolean, Float, ForeignKey, Index, String, Date, Text, func
 
 class Base(DeclarativeBase):
     pass
 
 class Patient(Base):
     __tablename__ = "patients"
+    # Backs list()'s ORDER BY last_name, first_name; the NOCASE column
+    # collations carry over, matching the index init_db creates on
+    # pre-existing databases.
+    __table_args__ = (Index("ix_patients_name", "last_name", "first_name"),)
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    # Business key shown in UI; enforced unique
-    cin: Mapped[str] = mapped_column(String(64), unique=True, index=True)
-    first_name: Mapped[str] = mapped_column(String(120))
-    last_name:  Mapped[str] = mapped_column(String(120))
+    # Business key shown in UI; enforced unique.  NOCASE collation keeps
+    # lookups case-insensitive without LOWER() wrappers that would defeat
+    # the index.
+    cin: Mapped[str] = mapped_column(String(64, collation="NOCASE"), unique=True, index=True)
+    first_name: Mapped[str] = mapped_column(String(120, collation="NOCASE"))
+    last_name:  Mapped[str] = mapped_column(String(120, collation="NOCASE"))
     birth_date: Mapped[Date | None] = mapped_column(Date, nullable=True)
     phone:      Mapped[str | None] = mapped_column(String(60), nullable=True)
-    email:      Mapped[str | None] = mapped_column(String(160), nullable=True)
+    email:      Mapped[str | None] = mapped_column(String(160, collation="NOCASE"), nullable=True)
     notes:      Mapped[str | None] = mapped_column(Text, nullable=True)
     created_at: Mapped[str] = mapped_column(server_default=func.datetime("now"))
-    updated_at: Mapped[str] = mapped_column(server_default=func.datetime("now"), onupdate=func.datetime("now"))
+    # Maintained by the patients_updated_at trigger (see init_db) rather
+    # than a client-side onupdate, so every UPDATE keeps the same SQL text
+    # and stays statement-cache friendly.
+    updated_at: Mapped[str] = mapped_column(server_default=func.datetime("now"))
+
+class Session(Base):
+    __tablename__ = "sessions"
+    # Composite index serves list_by_patient's WHERE + ORDER BY and the
+    # per-patient aggregate the summary triggers recompute.
+    __table_args__ = (Index("ix_sessions_patient_date", "patient_id", "session_date"),)
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    patient_id: Mapped[int] = mapped_column(ForeignKey("patients.id", ondelete="CASCADE"))
+    session_date: Mapped[Date] = mapped_column(Date)
+    price:    Mapped[float] = mapped_column(Float, default=0.0)
+    attended: Mapped[bool] = mapped_column(Boolean, default=False)
+    notes:    Mapped[str | None] = mapped_column(Text, nullable=True)
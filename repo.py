@@ -1,9 +1,17 @@
 from __future__ import annotations
-from sqlalchemy import select, func, or_, cast, String
+import re
+from contextlib import contextmanager
+from dataclasses import asdict
+from sqlalchemy import bindparam, insert, select, func, or_, cast, text, update as sqlupdate, String
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from models import Patient as PatientORM
-from domain import PatientDTO
+from models import Patient as PatientORM, Session as SessionORM
+from domain import PatientDTO, SessionDTO, PatientStatsDTO
+from datetime import date
+
+# Terms FTS5 can take as a quoted prefix token; anything else (spaces,
+# quotes, MATCH operators) falls back to the LIKE scan.
+_FTS_TERM = re.compile(r"^[\w@.\-]+$")
 
 def _to_dto(p: PatientORM) -> PatientDTO:
     return PatientDTO(
@@ -11,19 +19,93 @@ def _to_dto(p: PatientORM) -> PatientDTO:
         birth_date=p.birth_date, phone=p.phone, email=p.email, notes=p.notes
     )
 
+# Core column tuple matching PatientDTO's fields 1:1, so listings can map
+# rows straight into DTOs via **_mapping (one C-level dict splat per row
+# instead of eight attribute-access dispatches through the ORM).
+_DTO_COLS = (
+    PatientORM.id, PatientORM.cin, PatientORM.first_name, PatientORM.last_name,
+    PatientORM.birth_date, PatientORM.phone, PatientORM.email, PatientORM.notes,
+)
+
+# Statements built once at import time: SQLAlchemy's compiled cache hits on
+# the same construct and SQLite reuses the prepared bytecode; per-call work
+# is just parameter binding.
+_LIST_ALL = select(*_DTO_COLS).order_by(PatientORM.last_name, PatientORM.first_name)
+
+# SQLite LIKE is already case-insensitive; no LOWER() wrappers, which would
+# force per-row expression evaluation.  No IFNULL either: NULL LIKE '%q%'
+# is NULL, i.e. not matched, which is exactly what the OR needs — and the
+# planner can short-circuit on the first hit.
+_SEARCH_CLAUSE = or_(
+    PatientORM.cin.like(bindparam("q")),
+    PatientORM.first_name.like(bindparam("q")),
+    PatientORM.last_name.like(bindparam("q")),
+    PatientORM.phone.like(bindparam("q")),
+    PatientORM.email.like(bindparam("q")),
+    PatientORM.notes.like(bindparam("q")),
+    cast(PatientORM.birth_date, String).like(bindparam("q")),
+)
+
+def _search_blob(p: PatientDTO) -> str:
+    # All searchable fields folded once at cache-build time; the separator
+    # stops a query from matching across field boundaries.  Filtering is
+    # then a single C-level substring scan per row.
+    return "\x01".join((
+        p.cin, p.first_name, p.last_name,
+        p.phone or "", p.email or "", p.notes or "",
+        p.birth_date.isoformat() if p.birth_date else "",
+    )).lower()
+
 def _apply(dto: PatientDTO, orm: PatientORM | None = None) -> PatientORM:
     t = orm or PatientORM()
-    t.cin = dto.cin
-    t.first_name, t.last_name = dto.first_name, dto.last_name
-    t.birth_date, t.phone, t.email, t.notes = dto.birth_date, dto.phone, dto.email, dto.notes
+    for k, v in asdict(dto).items():
+        if k != "id":
+            setattr(t, k, v)
     return t
 
 class PatientRepo:
+    # Cached full list, shared across instances so a write through the
+    # write-session repo invalidates the read-session repo's view too.
+    # Beyond this size we stop caching and push filters back into SQL.
+    _cache: list[PatientDTO] | None = None
+    _CACHE_MAX = 20_000
+
     def __init__(self, s: Session):
         self.s = s
+        self._in_txn = False
+
+    @classmethod
+    def _invalidate(cls):
+        cls._cache = None
+
+    @contextmanager
+    def transaction(self):
+        """Batch several writes into a single commit (one fsync-equivalent
+        under WAL) instead of one per call."""
+        if self._in_txn:
+            yield
+            return
+        self._in_txn = True
+        try:
+            yield
+            self.s.commit()
+            self._invalidate()
+        except Exception:
+            self.s.rollback()
+            raise
+        finally:
+            self._in_txn = False
+
+    def _commit(self):
+        # Inside transaction() only flush; the context manager commits once.
+        if self._in_txn:
+            self.s.flush()
+        else:
+            self.s.commit()
 
     def exists_cin(self, cin: str, exclude_id: int | None = None) -> bool:
-        q = select(func.count(PatientORM.id)).where(func.lower(PatientORM.cin) == func.lower(cin))
+        # NOCASE column collation makes this an index probe, not a scan.
+        q = select(func.count(PatientORM.id)).where(PatientORM.cin == cin)
         if exclude_id is not None:
             q = q.where(PatientORM.id != exclude_id)
         return (self.s.scalar(q) or 0) > 0
@@ -34,47 +116,249 @@ class PatientRepo:
         orm = _apply(dto)
         self.s.add(orm)
         try:
-            self.s.commit()
+            self._commit()
         except IntegrityError as e:
             self.s.rollback()
             raise ValueError(f"CIN '{dto.cin}' already exists.") from e
+        self._invalidate()
         return orm.id
 
+    def create_many(self, dtos: list[PatientDTO]) -> int:
+        """Insert a batch as one executemany in one transaction — N INSERT
+        round-trips (and N commits) collapse into a single commit."""
+        if not dtos:
+            return 0
+        values = [asdict(d) for d in dtos]
+        for v in values:
+            v.pop("id")
+        try:
+            self.s.execute(insert(PatientORM), values)
+            self._commit()
+        except IntegrityError as e:
+            self.s.rollback()
+            raise ValueError("Duplicate CIN in import batch.") from e
+        self._invalidate()
+        return len(values)
+
+    def all_cins(self) -> set[str]:
+        # Uppercased snapshot of every CIN, so a bulk import can classify
+        # duplicates up front instead of probing per row.
+        return {c.upper() for c in self.s.scalars(select(PatientORM.cin))}
+
     def update(self, dto: PatientDTO) -> None:
         assert dto.id is not None
-        if self.exists_cin(dto.cin, exclude_id=dto.id):
-            raise ValueError(f"CIN '{dto.cin}' already exists.")
-        orm = self.s.get(PatientORM, dto.id)
-        if not orm:
-            return
-        _apply(dto, orm)
+        # Single UPDATE by rowid; the NOCASE unique index enforces CIN
+        # uniqueness, so no pre-check SELECTs (3 round trips down to 1).
+        values = asdict(dto)
+        values.pop("id")
         try:
-            self.s.commit()
+            self.s.execute(
+                sqlupdate(PatientORM).where(PatientORM.id == dto.id).values(**values)
+            )
+            self._commit()
         except IntegrityError as e:
             self.s.rollback()
             raise ValueError(f"CIN '{dto.cin}' already exists.") from e
+        self._invalidate()
 
     def get(self, pid: int) -> PatientDTO | None:
         orm = self.s.get(PatientORM, pid)
         return _to_dto(orm) if orm else None
 
+    def _fts_ids(self, q: str) -> list[int] | None:
+        """Resolve a search term via the patients_fts index, or None if the
+        term needs the LIKE fallback (FTS syntax, or no FTS table)."""
+        if not _FTS_TERM.match(q):
+            return None
+        try:
+            rows = self.s.execute(
+                text("SELECT rowid FROM patients_fts WHERE patients_fts MATCH :q"),
+                {"q": f'"{q}" *'},
+            )
+            return [r[0] for r in rows]
+        except Exception:
+            return None
+
+    def count(self) -> int:
+        return self.s.scalar(select(func.count(PatientORM.id))) or 0
+
     def list(self, q: str | None = None) -> list[PatientDTO]:
-        stmt = select(PatientORM).order_by(PatientORM.last_name, PatientORM.first_name)
-        if q:
-            q = f"%{q.lower()}%"
-            stmt = stmt.where(or_(
-                func.lower(PatientORM.cin).like(q),
-                func.lower(PatientORM.first_name).like(q),
-                func.lower(PatientORM.last_name).like(q),
-                func.lower(func.ifnull(PatientORM.phone, "")).like(q),
-                func.lower(func.ifnull(PatientORM.email, "")).like(q),
-                func.lower(func.ifnull(PatientORM.notes, "")).like(q),
-                func.lower(func.ifnull(cast(PatientORM.birth_date, String), "")).like(q),
-            ))
-        return [_to_dto(r) for r in self.s.scalars(stmt).all()]
+        if PatientRepo._cache is None:
+            n = self.count()
+            if n <= self._CACHE_MAX:
+                rows = [PatientDTO(**r._mapping) for r in self.s.execute(_LIST_ALL)]
+                for p in rows:
+                    p._blob = _search_blob(p)
+                PatientRepo._cache = rows
+        cache = PatientRepo._cache
+        if cache is not None:
+            # Per-keystroke filtering is pure RAM scanning; no SQL round trip.
+            if not q:
+                return list(cache)
+            ql = q.lower()
+            return [p for p in cache if ql in p._blob]
+        return self._list_sql(q)
+
+    def _filtered(self, stmt, q: str | None):
+        """Apply the global search to ``stmt``, returning (stmt, params);
+        a None stmt means FTS already proved there are no matches."""
+        if not q:
+            return stmt, {}
+        ids = self._fts_ids(q.strip())
+        if ids is not None:
+            if not ids:
+                return None, {}
+            return stmt.where(PatientORM.id.in_(ids)), {}
+        return stmt.where(_SEARCH_CLAUSE), {"q": f"%{q.lower()}%"}
+
+    def _list_sql(self, q: str | None) -> list[PatientDTO]:
+        stmt, params = self._filtered(_LIST_ALL, q)
+        if stmt is None:
+            return []
+        return [PatientDTO(**r._mapping) for r in self.s.execute(stmt, params)]
+
+    def list_rows(self, q: str | None = None) -> list:
+        """Lightweight listing for the table view: Core rows with just the
+        displayed columns (notes pre-truncated to what the cell shows),
+        no ORM hydration and no timestamps."""
+        stmt = select(
+            PatientORM.id, PatientORM.cin,
+            PatientORM.first_name, PatientORM.last_name,
+            PatientORM.birth_date, PatientORM.phone, PatientORM.email,
+            func.substr(PatientORM.notes, 1, 120).label("notes"),
+        ).order_by(PatientORM.last_name, PatientORM.first_name)
+        stmt, params = self._filtered(stmt, q)
+        if stmt is None:
+            return []
+        return self.s.execute(stmt, params).all()
+
+    def page(self, search: str | None = None, birth_from: date | None = None,
+             birth_to: date | None = None, cin_prefix: str | None = None,
+             offset: int = 0, limit: int | None = None) -> tuple[int, list]:
+        """SQL-side filtering and windowing for datasets past _CACHE_MAX:
+        SQLite applies WHERE + LIMIT/OFFSET against its indexes and only
+        the visible slice crosses into Python.  Returns (total, rows)."""
+        where, params = [], {}
+        if search:
+            ids = self._fts_ids(search.strip())
+            if ids is not None:
+                if not ids:
+                    return 0, []
+                where.append(PatientORM.id.in_(ids))
+            else:
+                where.append(_SEARCH_CLAUSE)
+                params["q"] = f"%{search.lower()}%"
+        if cin_prefix:
+            where.append(PatientORM.cin.startswith(cin_prefix))
+        if birth_from is not None:
+            where.append(PatientORM.birth_date >= birth_from)
+        if birth_to is not None:
+            where.append(PatientORM.birth_date <= birth_to)
+        total = self.s.execute(
+            select(func.count(PatientORM.id)).where(*where), params
+        ).scalar() or 0
+        stmt = select(
+            PatientORM.id, PatientORM.cin,
+            PatientORM.first_name, PatientORM.last_name,
+            PatientORM.birth_date, PatientORM.phone, PatientORM.email,
+            func.substr(PatientORM.notes, 1, 120).label("notes"),
+        ).where(*where).order_by(
+            PatientORM.last_name, PatientORM.first_name
+        ).offset(offset)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        return total, self.s.execute(stmt, params).all()
+
+    def distinct_values(self, column: str, like: str | None = None,
+                        limit: int = 500) -> list[str]:
+        """Distinct values of one patients column for checklist filters —
+        a SELECT DISTINCT ... LIMIT instead of scanning every loaded row."""
+        col = getattr(PatientORM, column)
+        stmt = select(col).distinct().where(col.is_not(None))
+        if like:
+            stmt = stmt.where(col.like(f"%{like}%"))
+        return self.s.scalars(stmt.order_by(col).limit(limit)).all()
+
+    def iter_rows(self, q: str | None = None):
+        """Stream export rows in 500-row batches — O(1) memory however
+        large the table gets (full notes included, unlike list_rows)."""
+        stmt = select(
+            PatientORM.id, PatientORM.cin,
+            PatientORM.first_name, PatientORM.last_name,
+            PatientORM.birth_date, PatientORM.phone, PatientORM.email,
+            PatientORM.notes,
+        ).order_by(PatientORM.last_name, PatientORM.first_name)
+        stmt, params = self._filtered(stmt, q)
+        if stmt is None:
+            return
+        yield from self.s.execute(stmt.execution_options(yield_per=500), params)
 
     def delete(self, pid: int) -> None:
         orm = self.s.get(PatientORM, pid)
+        if orm:
+            self.s.delete(orm)
+            self._commit()
+            self._invalidate()
+
+    def stats(self, pid: int) -> PatientStatsDTO:
+        # O(1) primary-key probe into the trigger-maintained summary table
+        # instead of aggregating the patient's sessions on every selection.
+        row = self.s.execute(
+            text("SELECT first_session, last_session, total, attended, revenue "
+                 "FROM patient_summary WHERE patient_id = :pid"),
+            {"pid": pid},
+        ).first()
+        if not row or not row.total:
+            return PatientStatsDTO(None, None, 0, 0.0, 0.0)
+        return PatientStatsDTO(
+            first_session=date.fromisoformat(row.first_session),
+            last_session=date.fromisoformat(row.last_session),
+            total_sessions=row.total,
+            attendance_rate=row.attended / row.total,
+            total_revenue=row.revenue,
+        )
+
+
+def _to_session_dto(o: SessionORM) -> SessionDTO:
+    return SessionDTO(
+        id=o.id, patient_id=o.patient_id, session_date=o.session_date,
+        price=o.price, attended=o.attended, notes=o.notes
+    )
+
+
+class SessionRepo:
+    def __init__(self, s: Session):
+        self.s = s
+
+    def create(self, dto: SessionDTO) -> int:
+        orm = SessionORM(
+            patient_id=dto.patient_id, session_date=dto.session_date,
+            price=dto.price, attended=dto.attended, notes=dto.notes
+        )
+        self.s.add(orm)
+        self.s.commit()
+        return orm.id
+
+    def update(self, dto: SessionDTO) -> None:
+        assert dto.id is not None
+        self.s.execute(
+            sqlupdate(SessionORM).where(SessionORM.id == dto.id).values(
+                patient_id=dto.patient_id, session_date=dto.session_date,
+                price=dto.price, attended=dto.attended, notes=dto.notes
+            )
+        )
+        self.s.commit()
+
+    def delete(self, sid: int) -> None:
+        orm = self.s.get(SessionORM, sid)
         if orm:
             self.s.delete(orm)
             self.s.commit()
+
+    def list_by_patient(self, pid: int) -> list[SessionDTO]:
+        stmt = (
+            select(SessionORM)
+            .where(SessionORM.patient_id == pid)
+            .order_by(SessionORM.session_date.desc(), SessionORM.id.desc())
+        )
+        return [_to_session_dto(o) for o in self.s.scalars(stmt).all()]
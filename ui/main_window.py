@@ -1,16 +1,20 @@
 from __future__ import annotations
 import sys
+from dataclasses import replace
 from pathlib import Path
 from datetime import date
-from PySide6.QtCore import Qt, QDate, QTimer
+from PySide6.QtCore import Qt, QDate, QTimer, QObject, QRunnable, QThreadPool, Signal
 from PySide6.QtGui import QAction
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QLabel, QSplitter,
-    QFormLayout, QDateEdit, QPlainTextEdit, QTableView, QMessageBox, QFileDialog, QStatusBar,
-    QTabWidget, QToolBar, QDialog, QDialogButtonBox, QDoubleSpinBox, QCheckBox, QGridLayout, QFrame
+    QFormLayout, QDateEdit, QPlainTextEdit, QTableView, QMessageBox, QStatusBar,
+    QTabWidget, QToolBar, QDialog, QGridLayout, QFrame
 )
+# QFileDialog / QDialogButtonBox / QDoubleSpinBox / QCheckBox are imported
+# lazily where used — they're off the startup path and keep first-frame
+# import work down.
 from sqlalchemy.orm import Session
-from database import make_engine, make_session_factory, init_db
+from database import make_engines, make_session_factories, init_db
 from models import Base
 from domain import PatientDTO, SessionDTO, PatientStatsDTO
 from repo import PatientRepo, SessionRepo
@@ -20,6 +24,24 @@ APP_DIR = Path(__file__).resolve().parents[1]
 DB_PATH = APP_DIR / "patients.db"
 
 
+# ---------- worker plumbing ----------
+class _Job(QRunnable):
+    """Run fn() on the global thread pool and deliver its result to cb on
+    the GUI thread (cross-thread signal emission queues automatically)."""
+
+    class _Sig(QObject):
+        done = Signal(object)
+
+    def __init__(self, fn, cb):
+        super().__init__()
+        self.fn = fn
+        self.sig = self._Sig()
+        self.sig.done.connect(cb)
+
+    def run(self):
+        self.sig.done.emit(self.fn())
+
+
 # ---------- widgets ----------
 class DateField(QDateEdit):
     def __init__(self, default_today=False):
@@ -59,6 +81,7 @@ class StatCard(QFrame):
 
 class SessionDialog(QDialog):
     def __init__(self, parent=None, initial: SessionDTO | None = None):
+        from PySide6.QtWidgets import QCheckBox, QDialogButtonBox, QDoubleSpinBox
         super().__init__(parent);
         self.setWindowTitle("Session")
         self.date = DateField(default_today=True)
@@ -105,12 +128,19 @@ class SessionDialog(QDialog):
 
 # ---------- main window ----------
 class MainWindow(QMainWindow):
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, read_session: Session | None = None,
+                 read_factory=None):
         super().__init__()
         self.setWindowTitle("Patient Desk (PySide6 + SQLAlchemy)")
         self.setMinimumSize(1100, 680)
         self.s = session
-        self.patients = PatientRepo(self.s)
+        self.read_s = read_session or session
+        # With a factory, blocking reads run on worker threads, each with
+        # its own pooled connection; without one they stay synchronous.
+        self._read_factory = read_factory
+        self._jobs: set[_Job] = set()
+        self.patients = PatientRepo(self.s)            # writes
+        self.patients_ro = PatientRepo(self.read_s)    # list/stats refreshes
         self.sessions = SessionRepo(self.s)
         self.current_patient_id: int | None = None
 
@@ -127,7 +157,7 @@ class MainWindow(QMainWindow):
         top_l.addWidget(self.search, 1)
 
         # left: patients table
-        self.pt_model = PatientTableModel(self.patients.list())
+        self.pt_model = PatientTableModel(self.patients_ro.list_rows())
         self.pt_table = QTableView()
         self.pt_table.setModel(self.pt_model)
         self.pt_table.setSelectionBehavior(QTableView.SelectRows)
@@ -156,6 +186,12 @@ class MainWindow(QMainWindow):
         # toolbars / menus
         self._build_toolbars()
 
+        # search debounce: one timer, one connection — restarting it on each
+        # keystroke coalesces a typing burst into a single refresh
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.timeout.connect(self._refresh_patients)
+
         # signals
         self.pt_table.selectionModel().selectionChanged.connect(self._on_patient_select)
         self.search.textChanged.connect(self._on_search_changed)
@@ -259,16 +295,30 @@ class MainWindow(QMainWindow):
         tb_s.addAction(self.act_s_del)
 
     # ----- helpers -----
-    def _debounced(self, fn, ms=250):
-        if not hasattr(self, "_debounce"): self._debounce = QTimer(self); self._debounce.setSingleShot(True)
-        self._debounce.timeout.connect(fn);
-        self._debounce.start(ms)
-
     def _on_search_changed(self, _):
-        self._debounced(self._refresh_patients, 250)
+        self._search_timer.start(250)
+
+    def _start_job(self, fn, cb):
+        job = _Job(fn, lambda res: (self._jobs.discard(job), cb(res)))
+        self._jobs.add(job)  # keep the signal bridge alive until delivery
+        QThreadPool.globalInstance().start(job)
 
     def _refresh_patients(self):
-        rows = self.patients.list(self.search.text().strip() or None)
+        q = self.search.text().strip() or None
+        if self._read_factory is None:
+            if self.read_s is not self.s:
+                # Read session never commits; expire so writes from the
+                # other session become visible.
+                self.read_s.expire_all()
+            self._apply_patient_rows(self.patients_ro.list_rows(q))
+            return
+
+        def work():
+            with self._read_factory() as rs:
+                return PatientRepo(rs).list_rows(q)
+        self._start_job(work, self._apply_patient_rows)
+
+    def _apply_patient_rows(self, rows):
         self.pt_model.set_rows(rows)
         self.statusBar().showMessage(f"{len(rows)} patient(s) loaded.", 1500)
 
@@ -294,7 +344,8 @@ class MainWindow(QMainWindow):
             return
         p = self.pt_model.at(idxs[0].row())
         self.current_patient_id = p.id
-        self._load_patient_to_ui(p)
+        # Table rows carry truncated notes; load the full record for the form.
+        self._load_patient_to_ui(self.patients_ro.get(p.id) or p)
         self._refresh_sessions()
         self._refresh_stats()
         self._update_actions()
@@ -312,11 +363,10 @@ class MainWindow(QMainWindow):
             QMessageBox.information(self, "Save", "Select a patient to save changes.");
             return None
         p = self.pt_model.at(idxs[0].row())
-        return PatientDTO(
-            id=p.id, first_name=p.first_name, last_name=p.last_name,
-            birth_date=p.birth_date, phone=p.phone, email=p.email,
-            notes=self.ov_notes.toPlainText().strip() or None
-        )
+        base = self.patients_ro.get(p.id)
+        if base is None:
+            return None
+        return replace(base, notes=self.ov_notes.toPlainText().strip() or None)
 
     def _new_patient(self):
         self.current_patient_id = None
@@ -334,7 +384,13 @@ class MainWindow(QMainWindow):
         if not dto: return
         self.patients.update(dto)
         self.statusBar().showMessage("Patient saved.", 1500)
-        self._refresh_patients()
+        # We know exactly which row changed — repaint it in place instead
+        # of re-running the list query and resetting the model.
+        row = self.pt_model.index_of(dto.id)
+        if row >= 0:
+            self.pt_model.update_row(row, dto)
+        else:
+            self._refresh_patients()
 
     def _delete_patient(self):
         if self.current_patient_id is None:
@@ -342,9 +398,13 @@ class MainWindow(QMainWindow):
             return
         if QMessageBox.question(self, "Confirm", "Delete this patient and all sessions?") != QMessageBox.Yes:
             return
+        row = self.pt_model.index_of(self.current_patient_id)
         self.patients.delete(self.current_patient_id)
         self._new_patient()
-        self._refresh_patients()
+        if row >= 0:
+            self.pt_model.remove_row(row)
+        else:
+            self._refresh_patients()
         self._update_actions()
         self.statusBar().showMessage("Patient deleted.", 1500)
 
@@ -354,7 +414,7 @@ class MainWindow(QMainWindow):
             for c in (self.card_first, self.card_last, self.card_total, self.card_rate, self.card_revenu):
                 c.set_value("—")
             return
-        st: PatientStatsDTO = self.patients.stats(self.current_patient_id)
+        st: PatientStatsDTO = self.patients_ro.stats(self.current_patient_id)
         self.card_first.set_value(st.first_session.isoformat() if st.first_session else "—")
         self.card_last.set_value(st.last_session.isoformat() if st.last_session else "—")
         self.card_total.set_value(str(st.total_sessions))
@@ -412,33 +472,56 @@ class MainWindow(QMainWindow):
         self.statusBar().showMessage("Session deleted.", 1500)
 
     # ----- export -----
-    def _export_csv(self):
-        path, _ = QFileDialog.getSaveFileName(self, "Export patients to CSV", "patients.csv", "CSV Files (*.csv)")
-        if not path: return
+    @staticmethod
+    def _write_export(path: str, repo: PatientRepo, q: str | None) -> int:
         import csv
-        rows = self.patients.list(self.search.text().strip() or None)
-        with open(path, "w", newline="", encoding="utf-8") as f:
+        # Stream straight from the cursor; a big export never sits in RAM,
+        # and the large buffer keeps write() syscalls rare.
+        n = 0
+        with open(path, "w", newline="", encoding="utf-8", buffering=1 << 16) as f:
             w = csv.writer(f)
             w.writerow(["id", "first_name", "last_name", "birth_date", "phone", "email", "notes"])
-            for p in rows:
+            for p in repo.iter_rows(q):
                 w.writerow([
                     p.id, p.first_name, p.last_name,
                     p.birth_date.isoformat() if p.birth_date else "",
                     p.phone or "", p.email or "", p.notes or ""
                 ])
-        self.statusBar().showMessage("Exported.", 1500)
+                n += 1
+        return n
+
+    def _export_csv(self):
+        from PySide6.QtWidgets import QFileDialog
+        path, _ = QFileDialog.getSaveFileName(self, "Export patients to CSV", "patients.csv", "CSV Files (*.csv)")
+        if not path: return
+        q = self.search.text().strip() or None
+        if self._read_factory is None:
+            n = self._write_export(path, self.patients_ro, q)
+            self.statusBar().showMessage(f"Exported {n} patient(s).", 1500)
+            return
+
+        self.statusBar().showMessage("Exporting…")
+
+        def work():
+            with self._read_factory() as rs:
+                return self._write_export(path, PatientRepo(rs), q)
+        self._start_job(work, lambda n: self.statusBar().showMessage(f"Exported {n} patient(s).", 1500))
 
 
 # ---- entrypoint (keep main.py that calls run()) ----
 def run():
-    engine = make_engine(DB_PATH);
-    init_db(engine, Base)
-    SessionFactory = make_session_factory(engine)
-    with SessionFactory() as s:
+    rw_engine, ro_engine = make_engines(DB_PATH)
+    init_db(rw_engine, Base)
+    WriteSession, ReadSession = make_session_factories(rw_engine, ro_engine)
+    with WriteSession() as s, ReadSession() as ro:
         app = QApplication(sys.argv)
-        w = MainWindow(s);
+        w = MainWindow(s, ro, read_factory=ReadSession);
         w.show()
-        sys.exit(app.exec())
+        rc = app.exec()
+    # Dispose so the close hooks run PRAGMA optimize on shutdown.
+    rw_engine.dispose()
+    ro_engine.dispose()
+    sys.exit(rc)
 
 
 if __name__ == "__main__":
@@ -1,17 +1,24 @@
 from __future__ import annotations
-import sys, csv
+import sys, csv, re
+from bisect import bisect_left
+from dataclasses import replace
 from pathlib import Path
 from datetime import date, datetime
 
-from PySide6.QtCore import Qt, QSortFilterProxyModel, QModelIndex, QTimer, QDate, QIdentityProxyModel
+from PySide6.QtCore import (
+    Qt, QAbstractProxyModel, QModelIndex, QTimer, QDate,
+    QObject, QRunnable, QThreadPool, Signal,
+)
+from PySide6.QtGui import QValidator
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QTableView,
     QPushButton, QLineEdit, QLabel, QFormLayout, QSplitter, QPlainTextEdit,
-    QAbstractItemView, QFileDialog, QStatusBar, QFrame, QDateEdit, QMessageBox
+    QAbstractItemView, QFileDialog, QStatusBar, QFrame, QDateEdit, QMessageBox,
+    QHeaderView
 )
 
 # absolute imports (project root)
-from database import make_engine, make_session_factory, init_db
+from database import make_engines, make_session_factories, init_db
 from models import Base
 from domain import PatientDTO
 from repo import PatientRepo
@@ -20,7 +27,7 @@ from ui.table_model import PatientTableModel
 APP_DIR = Path(__file__).resolve().parents[1]
 DB_PATH = APP_DIR / "patients.db"
 
-CSV_HEADERS = ["cin", "first_name", "last_name", "birth_date", "phone", "email", "notes"]
+CSV_HEADERS = ("cin", "first_name", "last_name", "birth_date", "phone", "email", "notes")
 
 PALETTE = {
     "blue": "#2563EB",
@@ -44,25 +51,75 @@ class DateField(QDateEdit):
     def clear_date(self): self.setDate(self.minimumDate())
 
 
+_BD_SLASH = re.compile(r"^(\d{1,2})/(\d{1,2})/(\d{4})$")
+# strptime("%Y-%m-%d") tolerated unpadded month/day; fromisoformat does not.
+_BD_DASH = re.compile(r"^(\d{4})-(\d{1,2})-(\d{1,2})$")
+
 def parse_birth_date(s: str) -> date | None:
     s = (s or "").strip()
     if not s: return None
-    for fmt in ("%Y-%m-%d", "%m/%d/%Y", "%d/%m/%Y"):
-        try: return datetime.strptime(s, fmt).date()
+    try:
+        return date.fromisoformat(s)  # common case: C parser, no strptime
+    except ValueError:
+        pass
+    m = _BD_DASH.match(s)
+    if m:
+        try: return date(int(m.group(1)), int(m.group(2)), int(m.group(3)))
         except ValueError: pass
+    m = _BD_SLASH.match(s)
+    if m:
+        a, b, y = int(m.group(1)), int(m.group(2)), int(m.group(3))
+        # Same precedence as the old strptime chain: MM/DD/YYYY wins when
+        # both readings are valid dates.
+        for month, day in ((a, b), (b, a)):
+            try: return date(y, month, day)
+            except ValueError: pass
     raise ValueError("Invalid birth_date. Use YYYY-MM-DD, MM/DD/YYYY, or DD/MM/YYYY.")
 
 
-# ------------------ Filter proxy (text + date + inclusion lists) ------------------
+class _UpperValidator(QValidator):
+    """Uppercases the CIN as it is typed, inside the edit's validation
+    pass — no re-entrant textChanged, no setText/cursor juggling."""
+    def validate(self, s: str, pos: int):
+        return QValidator.Acceptable, s.upper(), pos
+
+
+class _ImportJob(QRunnable):
+    """Runs a CSV import on the global thread pool; the inner QObject's
+    signal marshals the result back to the GUI thread."""
+    class _Sig(QObject):
+        done = Signal(object)
 
-class PatientFilterProxy(QSortFilterProxyModel):
+    def __init__(self, fn):
+        super().__init__()
+        self.sig = self._Sig()
+        self.fn = fn
+
+    def run(self):
+        try:
+            res = self.fn()
+        except Exception as e:   # surfaced by the done handler
+            res = e
+        self.sig.done.emit(res)
+
+
+# ------------------ Filter + pagination proxy ------------------
+
+class PatientProxy(QAbstractProxyModel):
     """
+    Single proxy doing filter, sort and pagination in one mapping layer.
     Columns: 0=ID, 1=CIN, 2=First, 3=Last, 4=Birth, 5=Phone, 6=Email, 7=Notes
-    Text filters (cin supports =EXACT / PREFIX* / contains).
-    Inclusion lists per column (Excel checklist).
+    Text filters (cin supports =EXACT / PREFIX* / contains), inclusion
+    lists per column (Excel checklist), global search, birth range.
+
+    The rows passing the filters are precomputed into ``_visible`` (source
+    row numbers, in display order) whenever the inputs change, so the view
+    never triggers per-row predicate calls and every map is one list
+    index — no filter-proxy → page-proxy double hop.
     """
     def __init__(self):
         super().__init__()
+        self.f_global = ""
         self.f_cin = ""
         self.f_first = ""
         self.f_last = ""
@@ -71,12 +128,68 @@ class PatientFilterProxy(QSortFilterProxyModel):
         self.f_birth_from: date | None = None
         self.f_birth_to:   date | None = None
         self.include_values: dict[int, set[str]] = {}
-        self.setFilterCaseSensitivity(Qt.CaseInsensitive)
+        self._page = 1
+        self._page_size = 25
+        self._hidden = False
+        # When set, the source model holds just the current page (fetched
+        # by SQL LIMIT/OFFSET) and this is the full match count.
+        self._server_total: int | None = None
+        self._visible: list[int] = []
+        self._pos: dict[int, int] = {}
+        self._sort_col = -1
+        self._sort_order = Qt.AscendingOrder
+        self._suspend_invalidate = False
+        # Coalesces rapid setter calls (typing, toggling checklist items)
+        # into one rebuild ~120 ms after the last change.
+        self._invalidate_timer = QTimer(self)
+        self._invalidate_timer.setSingleShot(True)
+        self._invalidate_timer.setInterval(120)
+        self._invalidate_timer.timeout.connect(self._rebuild)
+
+    # ----- source plumbing -----
+    def setSourceModel(self, model):
+        super().setSourceModel(model)
+        # Any source change re-derives _visible; CRUD is rare next to
+        # keystrokes, so a full pass there is fine.
+        model.modelReset.connect(self._rebuild)
+        model.layoutChanged.connect(self._rebuild)
+        model.rowsInserted.connect(self._rebuild)
+        model.rowsRemoved.connect(self._rebuild)
+        model.dataChanged.connect(self._rebuild)
+        self._rebuild()
+
+    # ----- filter state -----
+    # Bracket several setter calls with begin_bulk()/end_bulk() to rescan
+    # the rows once, not once per setter.
+    def begin_bulk(self):
+        self._suspend_invalidate = True
+
+    def end_bulk(self):
+        # The bracket already coalesced the changes; apply synchronously so
+        # callers can read counts right after.
+        self._suspend_invalidate = False
+        self._invalidate_timer.stop()
+        self._rebuild()
+
+    def _invalidate(self):
+        if not self._suspend_invalidate:
+            self._invalidate_timer.start()
 
     def set_inclusion_values(self, col: int, values: set[str] | None):
-        if values: self.include_values[col] = set(values)
-        else: self.include_values.pop(col, None)
-        self.invalidateFilter()
+        # Fold case once here, not per row per rebuild (dates compare as
+        # rendered text).  Interning lets membership tests hit the
+        # identity-compare fast path against the model's interned columns.
+        if values:
+            self.include_values[col] = frozenset(
+                sys.intern(v if col == 4 else v.lower()) for v in values
+            )
+        else:
+            self.include_values.pop(col, None)
+        self._invalidate()
+
+    def set_global_text(self, text: str):
+        self.f_global = (text or "").strip().lower()
+        self._invalidate()
 
     def set_filters(self, **kw):
         self.f_cin   = (kw.get("cin", "")).strip()
@@ -86,12 +199,11 @@ class PatientFilterProxy(QSortFilterProxyModel):
         self.f_email = (kw.get("email", "")).strip().lower()
         self.f_birth_from = kw.get("birth_from")
         self.f_birth_to   = kw.get("birth_to")
-        self.invalidateFilter()
+        self._invalidate()
 
-    def _match_cin(self, cell: str) -> bool:
+    def _match_cin(self, cell_low: str) -> bool:
         p = self.f_cin
         if not p: return True
-        cell_low = (cell or "").lower()
         p_low = p.lower()
         if p_low.startswith("="):   # exact
             return cell_low == p_low[1:]
@@ -99,88 +211,149 @@ class PatientFilterProxy(QSortFilterProxyModel):
             return cell_low.startswith(p_low[:-1])
         return p_low in cell_low    # contains
 
-    def filterAcceptsRow(self, source_row: int, parent: QModelIndex) -> bool:
-        m = self.sourceModel()
-        def at(col):
-            idx = m.index(source_row, col, parent)
-            v = m.data(idx, Qt.DisplayRole)
-            return "" if v is None else str(v)
-
-        id_   = at(0)
-        cin   = at(1)
-        first = at(2).lower()
-        last  = at(3).lower()
-        birth = at(4)  # yyyy-mm-dd or ""
-        phone = at(5).lower()
-        email = at(6).lower()
-        notes = at(7).lower()
-
-        # Inclusion (Excel checklist)
-        for col, allowed in self.include_values.items():
-            if allowed:
-                cell = [id_, cin, first, last, birth, phone, email, notes][col]
-                cell_cmp = cell if col == 4 else str(cell).lower()  # date stays as text
-                allowed_cmp = {a if col == 4 else a.lower() for a in allowed}
-                if cell_cmp not in allowed_cmp:
+    def _accepts(self, m, source_row: int) -> bool:
+        # Scan the model's structure-of-arrays columns: flat lists of
+        # already-lowercased str, no DTO attribute chasing, no per-cell
+        # index()/data() crossings of the PySide/C++ boundary.
+        id_   = m.id_str[source_row]
+        cin   = m.cin_lc[source_row]
+        first = m.first_lc[source_row]
+        last  = m.last_lc[source_row]
+        birth = m.birth_iso[source_row]
+        phone = m.phone_lc[source_row]
+        email = m.email_lc[source_row]
+        notes = m.notes_lc[source_row]
+
+        # Inclusion (Excel checklist) — sets are pre-lowercased, so this is
+        # one tuple index + one hash lookup per active column.
+        if self.include_values:
+            cells = (id_, cin, first, last, birth, phone, email, notes)
+            for col, allowed in self.include_values.items():
+                if cells[col] not in allowed:
                     return False
 
+        # Global search runs here, against rows loaded once — not as a SQL
+        # query per keystroke.
+        if self.f_global:
+            g = self.f_global
+            if (g not in cin and g not in first and g not in last
+                    and g not in phone and g not in email and g not in notes
+                    and g not in birth and g not in id_):
+                return False
+
         if not self._match_cin(cin): return False
         if self.f_first and self.f_first not in first: return False
         if self.f_last  and self.f_last  not in last:  return False
         if self.f_phone and self.f_phone not in phone: return False
         if self.f_email and self.f_email not in email: return False
 
-        if (self.f_birth_from or self.f_birth_to) and birth:
-            try:
-                bd = datetime.strptime(birth, "%Y-%m-%d").date()
+        if self.f_birth_from or self.f_birth_to:
+            # Date objects mirrored alongside the string columns — no
+            # parsing, no DTO attribute chase.
+            bd = m.birth_d[source_row]
+            if bd is not None:
                 if self.f_birth_from and bd < self.f_birth_from: return False
                 if self.f_birth_to   and bd > self.f_birth_to:   return False
-            except Exception:
-                pass
         return True
 
+    def _sort_key(self, m):
+        if self._sort_col == 0:
+            rows = m.rows
+            return lambda i: rows[i].id or 0
+        cols = (m.id_str, m.cin_lc, m.first_lc, m.last_lc,
+                m.birth_iso, m.phone_lc, m.email_lc, m.notes_lc)
+        return cols[self._sort_col].__getitem__
 
-# ------------------ Pagination proxy ------------------
-
-class PageProxy(QIdentityProxyModel):
-    def __init__(self):
-        super().__init__()
-        self._page = 1
-        self._page_size = 25
-
-    # ----- helpers -----
-    def _reset(self):
-        self.beginResetModel(); self.endResetModel()
+    def _rebuild(self, *_):
+        m = self.sourceModel()
+        self.beginResetModel()
+        if m is None:
+            self._visible, self._pos = [], {}
+        else:
+            accepts = self._accepts
+            vis = [i for i in range(len(m.rows)) if accepts(m, i)]
+            if self._sort_col >= 0:
+                vis.sort(key=self._sort_key(m),
+                         reverse=self._sort_order == Qt.DescendingOrder)
+            self._visible = vis
+            self._pos = {s: i for i, s in enumerate(vis)}
+        self._hidden = False
+        self.endResetModel()
+
+    def sort(self, column: int, order=Qt.AscendingOrder):
+        self._sort_col, self._sort_order = column, order
+        self._rebuild()
+
+    # ----- pagination -----
+    def set_server_total(self, total: int | None):
+        self._server_total = total
+
+    def _start(self) -> int:
+        # Server mode: the source rows already are the page window.
+        if self._server_total is not None:
+            return 0
+        return (self._page - 1) * self._page_size
+
+    def _visible_count(self) -> int:
+        return min(self._page_size, max(0, len(self._visible) - self._start()))
+
+    def _retarget(self, mutate):
+        # Row remove/insert notifications instead of a model reset, so the
+        # view keeps its header state, column widths and delegates while
+        # paging.  _hidden makes rowCount honest between begin/end pairs.
+        old = 0 if self._hidden else self._visible_count()
+        if old:
+            self.beginRemoveRows(QModelIndex(), 0, old - 1)
+            self._hidden = True
+            self.endRemoveRows()
+        mutate()
+        new = self._visible_count()
+        if new:
+            self.beginInsertRows(QModelIndex(), 0, new - 1)
+            self._hidden = False
+            self.endInsertRows()
+        else:
+            self._hidden = False
 
     def set_page(self, page: int):
         page = max(1, page)
         if page != self._page:
-            self._page = page
-            self._reset()
+            self._retarget(lambda: setattr(self, "_page", page))
 
     def set_page_size(self, size: int):
         size = max(1, size)
         if size != self._page_size:
-            self._page_size = size
-            self._reset()
+            self._retarget(lambda: setattr(self, "_page_size", size))
 
     def page(self) -> int: return self._page
     def page_size(self) -> int: return self._page_size
 
     def total_rows(self) -> int:
-        return self.sourceModel().rowCount() if self.sourceModel() else 0
+        if self._server_total is not None:
+            return self._server_total
+        return len(self._visible)
 
     def total_pages(self) -> int:
         n, k = self.total_rows(), self._page_size
         return max(1, (n + k - 1) // k)
 
+    # Source row numbers backing the current page / the whole filtered set;
+    # exports walk these directly with zero QModelIndex churn.
+    def page_source_rows(self) -> list[int]:
+        start = self._start()
+        return self._visible[start:start + self._visible_count()]
+
+    def filtered_source_rows(self) -> list[int]:
+        return self._visible
+
     # ----- Qt API -----
     def rowCount(self, parent=QModelIndex()) -> int:
-        if parent.isValid() or not self.sourceModel():
+        if parent.isValid() or not self.sourceModel() or self._hidden:
             return 0
-        start = (self._page - 1) * self._page_size
-        remaining = max(0, self.total_rows() - start)
-        return min(self._page_size, remaining)
+        return self._visible_count()
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return self.sourceModel().columnCount() if self.sourceModel() else 0
 
     def index(self, row: int, column: int, parent=QModelIndex()):
         if self.sourceModel() is None or parent.isValid():
@@ -193,14 +366,18 @@ class PageProxy(QIdentityProxyModel):
     def mapToSource(self, idx: QModelIndex) -> QModelIndex:
         if not idx.isValid() or not self.sourceModel():
             return QModelIndex()
-        start = (self._page - 1) * self._page_size
-        return self.sourceModel().index(start + idx.row(), idx.column())
+        row = self._start() + idx.row()
+        if row >= len(self._visible):
+            return QModelIndex()
+        return self.sourceModel().index(self._visible[row], idx.column())
 
     def mapFromSource(self, idx: QModelIndex) -> QModelIndex:
         if not idx.isValid():
             return QModelIndex()
-        start = (self._page - 1) * self._page_size
-        row = idx.row() - start
+        pos = self._pos.get(idx.row())
+        if pos is None:
+            return QModelIndex()
+        row = pos - self._start()
         if row < 0 or row >= self._page_size:
             return QModelIndex()
         return self.index(row, idx.column())
@@ -209,19 +386,33 @@ class PageProxy(QIdentityProxyModel):
 # ------------------ Main Window ------------------
 
 class ManagePatientsWindow(QMainWindow):
-    def __init__(self, session):
+    def __init__(self, session, read_session=None, write_factory=None):
         super().__init__()
         self.setWindowTitle("Manage Patients")
         self.setMinimumSize(1240, 760)
         self.setStatusBar(QStatusBar(self))
         self.s = session
-        self.repo = PatientRepo(self.s)
+        self.read_s = read_session or session
+        # Session factory for worker threads (imports); workers must not
+        # share the GUI thread's session.
+        self._write_factory = write_factory
+        self._jobs: set[_ImportJob] = set()
+        self.repo = PatientRepo(self.s)            # writes
+        self.read_repo = PatientRepo(self.read_s)  # list/search refreshes
         self.current_patient_id: int | None = None
+        self._server_mode = False
+
+        # Zero-interval single-shot: rapid Next/Next/Next clicks coalesce
+        # into one label refresh at the end of the event-loop burst.
+        self._label_timer = QTimer(self)
+        self._label_timer.setSingleShot(True)
+        self._label_timer.setInterval(0)
+        self._label_timer.timeout.connect(self._update_pagination_labels)
 
         self._build_ui()
         self._install_styles()
         self._refresh()
-        self.page_proxy.set_page(1)
+        self.proxy.set_page(1)
         self._update_pagination_labels()
         self._load_to_form(None)
         self._set_edit_enabled(False)
@@ -251,20 +442,26 @@ class ManagePatientsWindow(QMainWindow):
         top.addWidget(lbl); top.addWidget(self.search, 1)
         mv.addLayout(top)
 
-        # Table models
+        # Table model + the one proxy (filter/sort/page in a single layer)
         self.base_model = PatientTableModel([])
-        self.filter_proxy = PatientFilterProxy(); self.filter_proxy.setSourceModel(self.base_model)
-        self.page_proxy = PageProxy(); self.page_proxy.setSourceModel(self.filter_proxy)
+        self.proxy = PatientProxy(); self.proxy.setSourceModel(self.base_model)
 
         # Left column with table + pagination + import/export actions
         left = QWidget(); lv = QVBoxLayout(left); lv.setContentsMargins(0,0,0,0); lv.setSpacing(6)
 
         self.table = QTableView()
-        self.table.setModel(self.page_proxy)
+        self.table.setModel(self.proxy)
         self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.table.setSelectionMode(QAbstractItemView.SingleSelection)
         self.table.setAlternatingRowColors(True)
         self.table.verticalHeader().setVisible(False)
+        # Fixed uniform row heights + no wrapping: the view never calls
+        # sizeHintForRow per row or lays out multi-line cells.
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(28)
+        self.table.setWordWrap(False)
+        self.table.setTextElideMode(Qt.ElideRight)
+        self.table.setHorizontalScrollMode(QAbstractItemView.ScrollPerPixel)
         self.table.setSortingEnabled(True)
         self.table.sortByColumn(2, Qt.AscendingOrder)  # default sort by First name
         lv.addWidget(self.table, 1)
@@ -289,16 +486,12 @@ class ManagePatientsWindow(QMainWindow):
             try: size = int(self.e_page_size.text())
             except ValueError:
                 size = 25; self.e_page_size.setText("25")
-            self.page_proxy.set_page_size(size)
-            if self.page_proxy.page() > self.page_proxy.total_pages():
-                self.page_proxy.set_page(self.page_proxy.total_pages())
-            self._update_pagination_labels()
+            self.proxy.set_page_size(size)
+            self._goto_page(min(self.proxy.page(), self.proxy.total_pages()))
 
         self.e_page_size.editingFinished.connect(on_page_size)
-        self.btn_prev.clicked.connect(lambda: (self.page_proxy.set_page(self.page_proxy.page()-1),
-                                              self._update_pagination_labels()))
-        self.btn_next.clicked.connect(lambda: (self.page_proxy.set_page(self.page_proxy.page()+1),
-                                              self._update_pagination_labels()))
+        self.btn_prev.clicked.connect(lambda: self._goto_page(self.proxy.page() - 1))
+        self.btn_next.clicked.connect(lambda: self._goto_page(self.proxy.page() + 1))
 
         pag_row.addWidget(lbl_rpp); pag_row.addWidget(self.e_page_size); pag_row.addSpacing(12)
         pag_row.addWidget(self.btn_prev); pag_row.addWidget(self.lbl_page); pag_row.addWidget(self.btn_next)
@@ -324,7 +517,7 @@ class ManagePatientsWindow(QMainWindow):
         form = QFormLayout(form_wrap)
         self.e_id = QLineEdit(); self.e_id.setReadOnly(True)
         self.e_cin = QLineEdit(); self.e_cin.setPlaceholderText("Unique CIN (auto-uppercase)")
-        self.e_cin.textChanged.connect(lambda s: self._force_upper(self.e_cin, s))
+        self.e_cin.setValidator(_UpperValidator(self.e_cin))
         self.e_first = QLineEdit(); self.e_last = QLineEdit()
         self.e_bd = DateField()
         self.e_phone = QLineEdit(); self.e_email = QLineEdit()
@@ -382,42 +575,114 @@ class ManagePatientsWindow(QMainWindow):
         self._debounce.timeout.connect(fn); self._debounce.start(ms)
 
     def _on_global_search(self, _):
-        self._debounced(lambda: (self._refresh(), self.page_proxy.set_page(1), self._update_pagination_labels()), 200)
+        # Filter the rows already in the model; the repo is only hit again
+        # on CRUD or an explicit refresh.
+        self._debounced(self._apply_global_search, 200)
+
+    def _apply_global_search(self):
+        if self._server_mode:
+            self.proxy.set_page(1)
+            self._refresh_server()
+            self._update_pagination_labels()
+            return
+        # Already debounced at the text-box level; apply synchronously so
+        # the pagination labels below read the post-filter counts.
+        self.proxy.begin_bulk()
+        self.proxy.set_global_text(self.search.text())
+        self.proxy.end_bulk()
+        self.proxy.set_page(1)
+        self._update_pagination_labels()
 
     def _refresh(self):
-        rows = self.repo.list(self.search.text().strip() or None)
+        if self.read_s is not self.s:
+            # The read session never commits; drop its identity-map state
+            # so rows written through the write session show up.
+            self.read_s.expire_all()
+        # Past the repo's cache ceiling, filtering/paging move into SQL
+        # and only the visible page is loaded; below it, everything stays
+        # in memory and the proxies do the work per keystroke.
+        self._server_mode = self.read_repo.count() > PatientRepo._CACHE_MAX
+        if self._server_mode:
+            if self.proxy.f_global:
+                # SQL owns the global search here; a needle left over from
+                # the in-memory era would re-filter the fetched page rows
+                # (and reject matches past the 120-char notes slice they
+                # carry).
+                self.proxy.begin_bulk()
+                self.proxy.set_global_text("")
+                self.proxy.end_bulk()
+            self._refresh_server()
+            return
+        self.proxy.set_server_total(None)
+        rows = self.read_repo.list(None)
         if not hasattr(self, "base_model"): self.base_model = PatientTableModel(rows)
         self.base_model.set_rows(rows)
+        if self.proxy.f_global != (self.search.text() or "").strip().lower():
+            # Back below the ceiling: the proxy filters again, so re-sync
+            # its needle with whatever the search box shows.
+            self.proxy.begin_bulk()
+            self.proxy.set_global_text(self.search.text())
+            self.proxy.end_bulk()
+
+    def _refresh_server(self):
+        page, size = self.proxy.page(), self.proxy.page_size()
+        total, rows = self.read_repo.page(
+            search=self.search.text().strip() or None,
+            offset=(page - 1) * size, limit=size,
+        )
+        self.proxy.set_server_total(total)
+        if len(rows) == self.base_model.rowCount():
+            # Full-page flip: same shape, cells just change value.
+            self.base_model.replace_window(rows)
+        else:
+            self.base_model.set_rows(rows)
 
-    def _update_pagination_labels(self):
-        tp = self.page_proxy.total_pages()
-        if self.page_proxy.page() > tp: self.page_proxy.set_page(tp)
-        if self.page_proxy.page() < 1:  self.page_proxy.set_page(1)
+    def _goto_page(self, page: int):
+        self.proxy.set_page(page)
+        if self._server_mode:
+            self._refresh_server()
+        self._label_timer.start()
 
-        page = self.page_proxy.page()
-        size = self.page_proxy.page_size()
-        total_all = self.base_model.rowCount()
+    def _update_pagination_labels(self):
+        tp = self.proxy.total_pages()
+        if not 1 <= self.proxy.page() <= tp:
+            self.proxy.set_page(min(max(self.proxy.page(), 1), tp))
+            if self._server_mode: self._refresh_server()
+
+        page = self.proxy.page()
+        size = self.proxy.page_size()
+        total_all = self.proxy.total_rows()
         start = (page - 1) * size
         end = min(start + size, total_all)
 
-        self.lbl_page.setText(f"Page {page} / {tp}")
-        if total_all == 0:
-            self.lbl_range.setText("Showing 0 of 0")
-        else:
-            self.lbl_range.setText(f"Showing {start+1}–{end} of {total_all}")
-
-        self.btn_prev.setEnabled(page > 1)
-        self.btn_next.setEnabled(page < tp)
+        # Only touch widgets whose state actually changed; every setText/
+        # setEnabled schedules a repaint (and QSS re-evaluation) even when
+        # the value is identical, and this runs on every Next/Prev click.
+        state = (
+            f"Page {page} / {tp}",
+            "Showing 0 of 0" if total_all == 0
+            else f"Showing {start+1}–{end} of {total_all}",
+            page > 1, page < tp,
+        )
+        old = getattr(self, "_pag_state", (None,) * 4)
+        if state[0] != old[0]: self.lbl_page.setText(state[0])
+        if state[1] != old[1]: self.lbl_range.setText(state[1])
+        if state[2] != old[2]: self.btn_prev.setEnabled(state[2])
+        if state[3] != old[3]: self.btn_next.setEnabled(state[3])
+        self._pag_state = state
 
     # ----- Selection & form -----
     def _on_select(self, *_):
         idxs = self.table.selectionModel().selectedRows()
         if not idxs:
             self._load_to_form(None); self._set_edit_enabled(False); return
-        idx_view = idxs[0]
-        idx_in_filter = self.page_proxy.mapToSource(idx_view)
-        src_row = self.filter_proxy.mapToSource(idx_in_filter).row()
+        src_row = self.proxy.mapToSource(idxs[0]).row()
         p = self.base_model.rows[src_row]
+        if self._server_mode:
+            # Server-mode page rows carry truncated notes; load the full
+            # record for the editable form or a save would write the
+            # 120-char prefix back over the real note.
+            p = self.read_repo.get(p.id) or p
         self._load_to_form(p)
         self._set_edit_enabled(True)
 
@@ -438,12 +703,6 @@ class ManagePatientsWindow(QMainWindow):
             w.setEnabled(enabled)
         self.btn_save.setEnabled(enabled)
 
-    def _force_upper(self, w: QLineEdit, s: str):
-        up = s.upper()
-        if s != up:
-            pos = w.cursorPosition()
-            w.blockSignals(True); w.setText(up); w.setCursorPosition(pos); w.blockSignals(False)
-
     # ----- CRUD -----
     def _new(self):
         self.table.clearSelection()
@@ -466,19 +725,39 @@ class ManagePatientsWindow(QMainWindow):
             notes=self.e_notes.toPlainText().strip() or None
         )
 
+    def _sorted_pos(self, dto: PatientDTO) -> int:
+        # Mirror the repo's ORDER BY last_name, first_name (NOCASE) so a
+        # targeted insert lands where the next full refresh would put it.
+        key = (dto.last_name.lower(), dto.first_name.lower())
+        return bisect_left(self.base_model.rows, key,
+                           key=lambda p: (p.last_name.lower(), p.first_name.lower()))
+
     def _save(self):
         dto = self._collect()
         if not dto: return
         try:
             if dto.id is None:
-                self.repo.create(dto)
+                new_id = self.repo.create(dto)
+                dto = replace(dto, id=new_id)
+                if self._server_mode:
+                    # The model only holds the current SQL page; re-fetch.
+                    self._refresh()
+                else:
+                    # Single-row insert at the sorted position — no SQL
+                    # reload, no model reset for a one-patient change.
+                    self.base_model.insert_row(self._sorted_pos(dto), dto)
                 self._msg_info("Patient created", f"Patient with CIN '{dto.cin}' has been created.")
             else:
                 if not self._confirm("Confirm modification", "Save changes to this patient?"): return
                 self.repo.update(dto)
+                row = self.base_model.index_of(dto.id)
+                if row >= 0 and not self._server_mode:
+                    self.base_model.update_row(row, dto)
+                else:
+                    self._refresh()
         except ValueError as e:
             self._msg_critical("Duplicate CIN", str(e)); return
-        self._refresh(); self.page_proxy.set_page(1); self._update_pagination_labels()
+        self._update_pagination_labels()
         self._reselect_cin(dto.cin)
 
     def _delete(self):
@@ -486,17 +765,19 @@ class ManagePatientsWindow(QMainWindow):
             self._msg_info("Delete", "Select a patient first."); return
         if not self._confirm("Confirm deletion", "Delete this patient?"): return
         self.repo.delete(self.current_patient_id)
-        self._load_to_form(None); self._refresh(); self._set_edit_enabled(False)
+        row = self.base_model.index_of(self.current_patient_id)
+        if row >= 0 and not self._server_mode:
+            self.base_model.remove_row(row)
+        else:
+            self._refresh()
+        self._load_to_form(None); self._set_edit_enabled(False)
         self._update_pagination_labels()
 
     def _reselect_cin(self, cin: str):
-        for row in range(self.base_model.rowCount()):
-            if self.base_model.at(row).cin == cin:
-                src_idx = self.base_model.index(row, 0)
-                idx_in_filter = self.filter_proxy.mapFromSource(src_idx)
-                proxy_row = self.page_proxy.mapFromSource(idx_in_filter).row()
-                if proxy_row >= 0: self.table.selectRow(proxy_row)
-                break
+        row = self.base_model.row_of_cin(cin)
+        if row < 0: return
+        idx = self.proxy.mapFromSource(self.base_model.index(row, 0))
+        if idx.isValid(): self.table.selectRow(idx.row())
 
     # ----- CSV -----
     def _export_csv_current_page(self):
@@ -504,37 +785,53 @@ class ManagePatientsWindow(QMainWindow):
             self, "Export current page", f"patients_page_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv", "CSV Files (*.csv)"
         )
         if not path: return
-        with open(path, "w", newline="", encoding="utf-8") as f:
+        rows = self.base_model.rows
+        page_rows = self.proxy.page_source_rows()
+        # 1 MiB buffer: batch the row writes into few large write()
+        # syscalls instead of one per 8 KiB of CSV.
+        with open(path, "w", newline="", encoding="utf-8", buffering=1 << 20) as f:
             w = csv.writer(f); w.writerow(CSV_HEADERS)
-            for r in range(self.page_proxy.rowCount()):
-                idx_page = self.page_proxy.index(r, 0)
-                idx_filter = self.page_proxy.mapToSource(idx_page)
-                src_row = self.filter_proxy.mapToSource(idx_filter).row()
-                p = self.base_model.at(src_row)
-                w.writerow([
-                    p.cin, p.first_name, p.last_name,
-                    p.birth_date.isoformat() if p.birth_date else "",
-                    p.phone or "", p.email or "", p.notes or ""
-                ])
-        self._msg_info("Export", f"Exported {self.page_proxy.rowCount()} patient(s).")
+            w.writerows(
+                (p.cin, p.first_name, p.last_name,
+                 p.birth_date.isoformat() if p.birth_date else "",
+                 p.phone or "", p.email or "", p.notes or "")
+                for p in (rows[i] for i in page_rows)
+            )
+        self._msg_info("Export", f"Exported {len(page_rows)} patient(s).")
 
     def _export_csv_all_filtered(self):
         path, _ = QFileDialog.getSaveFileName(
             self, "Export filtered patients", f"patients_filtered_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv", "CSV Files (*.csv)"
         )
         if not path: return
-        with open(path, "w", newline="", encoding="utf-8") as f:
+        if self._server_mode:
+            # The model only holds the current SQL page; stream the whole
+            # filtered set from the DB in yield_per batches instead.
+            n = 0
+            with open(path, "w", newline="", encoding="utf-8", buffering=1 << 20) as f:
+                w = csv.writer(f); w.writerow(CSV_HEADERS)
+                for p in self.read_repo.iter_rows(self.search.text().strip() or None):
+                    w.writerow([
+                        p.cin, p.first_name, p.last_name,
+                        p.birth_date.isoformat() if p.birth_date else "",
+                        p.phone or "", p.email or "", p.notes or ""
+                    ])
+                    n += 1
+            self._msg_info("Export", f"Exported {n} patient(s).")
+            return
+        rows = self.base_model.rows
+        visible = self.proxy.filtered_source_rows()
+        with open(path, "w", newline="", encoding="utf-8", buffering=1 << 20) as f:
             w = csv.writer(f); w.writerow(CSV_HEADERS)
-            for r in range(self.filter_proxy.rowCount()):
-                idx_filter = self.filter_proxy.index(r, 0)
-                src_row = self.filter_proxy.mapToSource(idx_filter).row()
-                p = self.base_model.at(src_row)
-                w.writerow([
-                    p.cin, p.first_name, p.last_name,
-                    p.birth_date.isoformat() if p.birth_date else "",
-                    p.phone or "", p.email or "", p.notes or ""
-                ])
-        self._msg_info("Export", f"Exported {self.filter_proxy.rowCount()} patient(s).")
+            # One writerows() call over the precomputed visible rows: the C
+            # csv writer drives the generator, no proxy mapping per row.
+            w.writerows(
+                (p.cin, p.first_name, p.last_name,
+                 p.birth_date.isoformat() if p.birth_date else "",
+                 p.phone or "", p.email or "", p.notes or "")
+                for p in (rows[i] for i in visible)
+            )
+        self._msg_info("Export", f"Exported {len(visible)} patient(s).")
 
     def _save_csv_template(self):
         path, _ = QFileDialog.getSaveFileName(self, "Save CSV Template", "patients_template.csv", "CSV Files (*.csv)")
@@ -547,54 +844,100 @@ class ManagePatientsWindow(QMainWindow):
     def _import_csv(self):
         path, _ = QFileDialog.getOpenFileName(self, "Import patients from CSV", "", "CSV Files (*.csv)")
         if not path: return
+        if self._write_factory is not None:
+            # Parse + validate + bulk insert on a pool thread with its own
+            # session; the GUI stays responsive for the whole import.
+            def work():
+                with self._write_factory() as ws:
+                    return self._import_file(path, PatientRepo(ws))
+            job = _ImportJob(work)
+            self._jobs.add(job)
+            job.sig.done.connect(lambda res, j=job: (self._jobs.discard(j),
+                                                     self._import_done(res)))
+            QThreadPool.globalInstance().start(job)
+            return
+        self._import_done(self._import_file(path, self.repo))
+
+    def _import_file(self, path: str, repo: PatientRepo):
         with open(path, "r", newline="", encoding="utf-8-sig") as f:
-            raw = f.read().splitlines()
-        if not raw: self._msg_warn("Import", "The CSV file is empty."); return
-
-        kept = []
-        for i, line in enumerate(raw):
-            if i == 0: kept.append(line); continue
-            if not line.strip(): continue
-            if line.lstrip().startswith("#"): continue
-            kept.append(line)
-
-        reader = csv.DictReader(kept)
-        missing = [h for h in CSV_HEADERS if h not in (reader.fieldnames or [])]
-        if missing:
-            self._msg_critical("Import", "Missing headers: " + ", ".join(missing) +
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return ("empty", 0, [])
+            fields = [h.strip() for h in header]
+            missing = [h for h in CSV_HEADERS if h not in fields]
+            if missing:
+                return ("missing", missing, [])
+            # Positional access from here on: one list index per field
+            # instead of a fresh dict plus six .get() calls per row.
+            cols = tuple(fields.index(h) for h in CSV_HEADERS)
+            created, errors = self._import_rows(reader, cols, repo)
+            return ("ok", created, errors)
+
+    def _import_done(self, res):
+        if isinstance(res, Exception):
+            self._msg_critical("Import", str(res)); return
+        kind, a, b = res
+        if kind == "empty":
+            self._msg_warn("Import", "The CSV file is empty."); return
+        if kind == "missing":
+            self._msg_critical("Import", "Missing headers: " + ", ".join(a) +
                                "\nExpected: " + ", ".join(CSV_HEADERS)); return
+        self._refresh(); self.proxy.set_page(1); self._update_pagination_labels()
+        self._show_import_result(a, b)
+
+    def _import_rows(self, reader, cols, repo: PatientRepo) -> tuple[int, list[dict]]:
+        # One SELECT up front classifies duplicates (against the DB and
+        # within the file); valid rows are then bulk-inserted in a single
+        # transaction instead of one INSERT + commit per patient.
+        existing = repo.all_cins()
+        c_cin, c_first, c_last, c_bd, c_phone, c_email, c_notes = cols
+        dtos, errors = [], []
+        # Real CSVs repeat date strings; parse each distinct one once
+        # instead of paying the strptime cascade per row.
+        bd_cache: dict[str, date | None] = {}
+        _missing = object()
+
+        def cell(row, i):
+            # Ragged rows (trailing fields omitted) read as empty.
+            return row[i].strip() if i < len(row) else ""
 
-        created, errors = 0, []
         for idx, row in enumerate(reader, start=2):
+            # Comment and blank lines are data to csv.reader; drop them here.
+            if not row or row[0].lstrip().startswith("#"):
+                continue
             try:
-                cin = (row.get("cin") or "").strip().upper()
-                first = (row.get("first_name") or "").strip()
-                last  = (row.get("last_name") or "").strip()
+                cin = cell(row, c_cin).upper()
+                first = cell(row, c_first)
+                last  = cell(row, c_last)
                 if not cin or not first or not last:
                     raise ValueError("cin, first_name and last_name are required")
-                bd = parse_birth_date(row.get("birth_date", ""))
-
-                dto = PatientDTO(
+                if cin in existing:
+                    raise ValueError(f"CIN '{cin}' already exists.")
+                raw_bd = cell(row, c_bd)
+                bd = bd_cache.get(raw_bd, _missing)
+                if bd is _missing:
+                    bd = bd_cache[raw_bd] = parse_birth_date(raw_bd)
+
+                dtos.append(PatientDTO(
                     id=None, cin=cin, first_name=first, last_name=last, birth_date=bd,
-                    phone=(row.get("phone") or "").strip() or None,
-                    email=(row.get("email") or "").strip() or None,
-                    notes=(row.get("notes") or "").strip() or None
-                )
-                self.repo.create(dto); created += 1
+                    phone=cell(row, c_phone) or None,
+                    email=cell(row, c_email) or None,
+                    notes=cell(row, c_notes) or None
+                ))
+                existing.add(cin)
             except Exception as e:
                 errors.append({
                     "line": idx, "error": str(e),
-                    "cin": (row.get("cin") or "").strip(),
-                    "first_name": (row.get("first_name") or "").strip(),
-                    "last_name":  (row.get("last_name") or "").strip(),
-                    "birth_date": (row.get("birth_date") or "").strip(),
-                    "phone":      (row.get("phone") or "").strip(),
-                    "email":      (row.get("email") or "").strip(),
-                    "notes":      (row.get("notes") or "").strip(),
+                    "cin": cell(row, c_cin),
+                    "first_name": cell(row, c_first),
+                    "last_name":  cell(row, c_last),
+                    "birth_date": cell(row, c_bd),
+                    "phone":      cell(row, c_phone),
+                    "email":      cell(row, c_email),
+                    "notes":      cell(row, c_notes),
                 })
-
-        self._refresh(); self.page_proxy.set_page(1); self._update_pagination_labels()
-        self._show_import_result(created, errors)
+        return repo.create_many(dtos), errors
 
     def _show_import_result(self, created: int, errors: list[dict]):
         if not errors:
@@ -626,19 +969,23 @@ class ManagePatientsWindow(QMainWindow):
 
 # ---- entrypoint (adds CIN unique index if missing) ----
 def run():
-    engine = make_engine(DB_PATH)
-    init_db(engine, Base)
-    with engine.begin() as conn:
+    rw_engine, ro_engine = make_engines(DB_PATH)
+    init_db(rw_engine, Base)
+    with rw_engine.begin() as conn:
         cols = [r[1] for r in conn.exec_driver_sql("PRAGMA table_info(patients)").fetchall()]
         if "cin" not in cols:
             conn.exec_driver_sql("ALTER TABLE patients ADD COLUMN cin VARCHAR(64)")
         conn.exec_driver_sql("CREATE UNIQUE INDEX IF NOT EXISTS uq_patients_cin ON patients(cin)")
-    SessionFactory = make_session_factory(engine)
-    with SessionFactory() as s:
+    WriteSession, ReadSession = make_session_factories(rw_engine, ro_engine)
+    with WriteSession() as s, ReadSession() as ro:
         app = QApplication(sys.argv)
-        w = ManagePatientsWindow(s)
+        w = ManagePatientsWindow(s, ro, write_factory=WriteSession)
         w.show()
-        sys.exit(app.exec())
+        rc = app.exec()
+    # Dispose so the close hooks run PRAGMA optimize on shutdown.
+    rw_engine.dispose()
+    ro_engine.dispose()
+    sys.exit(rc)
 
 
 if __name__ == "__main__":
@@ -1,30 +1,197 @@
 # ui/table_model.py
 from __future__ import annotations
+from sys import intern
 from typing import List
 from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
-from domain import PatientDTO
+from domain import PatientDTO, SessionDTO
+
+# The paint loop cycles data() through a dozen roles per cell; one set
+# membership test rejects everything but display/edit. Stored as plain
+# ints so the hash/compare never goes through the enum machinery.
+_DISPLAY_ROLES = frozenset((int(Qt.DisplayRole), int(Qt.EditRole)))
+
 
 class PatientTableModel(QAbstractTableModel):
     """
     Model backed by a list of PatientDTO.
     Column order matches ManagePatients: 0=ID, 1=CIN, 2=First, 3=Last, 4=Birth, 5=Phone, 6=Email, 7=Notes
     """
-    headers = ["ID", "CIN", "First name", "Last name", "Birth date", "Phone", "Email", "Notes"]
+    headers = ("ID", "CIN", "First name", "Last name", "Birth date", "Phone", "Email", "Notes")
+    _NCOLS = len(headers)
 
     def __init__(self, rows: List[PatientDTO] | None = None, parent=None):
         super().__init__(parent)
         self.rows: List[PatientDTO] = rows or []
+        self._reindex()
 
     # external helpers
     def set_rows(self, rows: List[PatientDTO] | None):
-        self.beginResetModel()
+        # Layout-change signalling instead of a model reset: the schema
+        # never changes, so views keep selection and scroll position for
+        # rows that survive (remapped by CIN below) rather than being
+        # torn down and repopulated.
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        old_cins = [self.rows[ix.row()].cin for ix in persistent]
         self.rows = rows or []
-        self.endResetModel()
+        self._reindex()
+        for ix, cin in zip(persistent, old_cins):
+            row = self._cin_index.get(cin, -1)
+            self.changePersistentIndex(
+                ix, self.index(row, ix.column()) if row >= 0 else QModelIndex()
+            )
+        self.layoutChanged.emit()
+
+    @staticmethod
+    def _cols_of(p) -> tuple:
+        return (
+            str(p.id) if p.id is not None else "",
+            (p.cin or "").lower(),
+            # Names repeat across patients; interning shares one object
+            # per distinct token and makes set membership pointer-compare.
+            intern(p.first_name.lower()),
+            intern(p.last_name.lower()),
+            p.birth_date.isoformat() if p.birth_date else "",
+            (p.phone or "").lower(),
+            (p.email or "").lower(),
+            (p.notes or "").lower(),
+        )
+
+    def _reindex(self):
+        # CIN → row position, so re-selecting a just-saved patient is a
+        # dict lookup instead of an O(N) scan.
+        self._cin_index = {p.cin: i for i, p in enumerate(self.rows)}
+        # Structure-of-arrays mirror of the searchable columns, folded
+        # once here: the filter proxy scans flat lists of str instead of
+        # chasing a DTO and re-lowercasing per cell per keystroke.
+        cols = list(zip(*map(self._cols_of, self.rows))) if self.rows else [()] * 8
+        (self.id_str, self.cin_lc, self.first_lc, self.last_lc,
+         self.birth_iso, self.phone_lc, self.email_lc, self.notes_lc) = \
+            (list(c) for c in cols)
+        self.birth_d = [p.birth_date for p in self.rows]
+        # Ready-to-display cell values, one tuple per row: data() hands
+        # these out by index instead of formatting under Qt's per-paint
+        # callback (isoformat, `or ""`, the notes slice).
+        self._cells = [self._display_of(p, i) for i, p in enumerate(self.rows)]
+        # rowCount is hammered during scroll/selection; hand out a cached
+        # int rather than len() per probe.
+        self._row_count = len(self.rows)
+
+    def _display_of(self, p, row: int) -> tuple:
+        return (
+            p.id,                                   # 0 ID (DB PK)
+            p.cin,                                  # 1 CIN (user key)
+            p.first_name,                           # 2
+            p.last_name,                            # 3
+            self.birth_iso[row],                    # 4
+            p.phone or "",                          # 5
+            p.email or "",                          # 6
+            (p.notes or "")[:120],                  # 7
+        )
+
+    def replace_window(self, rows: List[PatientDTO]):
+        """Swap in a same-sized row window (server-mode page flip): one
+        dataChanged over the full extent, no layout or reset churn."""
+        self.rows = list(rows)
+        self._reindex()
+        self.dataChanged.emit(
+            self.index(0, 0), self.index(self._row_count - 1, self._NCOLS - 1)
+        )
+
+    def row_of_cin(self, cin: str) -> int:
+        return self._cin_index.get(cin, -1)
 
     def at(self, row: int) -> PatientDTO:
         return self.rows[row]
 
+    def index_of(self, pid: int) -> int:
+        for i, p in enumerate(self.rows):
+            if p.id == pid:
+                return i
+        return -1
+
+    def update_row(self, row: int, p: PatientDTO):
+        # Targeted repaint of one row; no model reset, no full rescan.
+        old = self.rows[row]
+        self.rows[row] = p
+        if old.cin != p.cin:
+            self._cin_index.pop(old.cin, None)
+            self._cin_index[p.cin] = row
+        (self.id_str[row], self.cin_lc[row], self.first_lc[row],
+         self.last_lc[row], self.birth_iso[row], self.phone_lc[row],
+         self.email_lc[row], self.notes_lc[row]) = self._cols_of(p)
+        self.birth_d[row] = p.birth_date
+        self._cells[row] = self._display_of(p, row)
+        self.dataChanged.emit(
+            self.index(row, 0), self.index(row, len(self.headers) - 1)
+        )
+
+    def insert_row(self, row: int, p: PatientDTO):
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.rows.insert(row, p)
+        self._reindex()
+        self.endInsertRows()
+
+    def remove_row(self, row: int):
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.rows[row]
+        # Every row after the removed one shifts; rebuild the map (deletes
+        # are rare next to saves and keystrokes).
+        self._reindex()
+        self.endRemoveRows()
+
     # Qt model API
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else self._row_count
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else self._NCOLS
+
+    def data(self, idx: QModelIndex, role=Qt.DisplayRole):
+        # Role first: the view probes ToolTip/SizeHint/Font/... per paint,
+        # and those calls should bail on one test.
+        if role not in _DISPLAY_ROLES:
+            return None
+        row = idx.row()
+        if not idx.isValid() or row < 0 or row >= self._row_count:
+            return None
+        return self._cells[row][idx.column()]
+
+    def headerData(self, section: int, orientation, role=Qt.DisplayRole):
+        # Same shape as data(): reject the role first, then one tuple
+        # index (row headers stay 1-based ints, computed on demand).
+        if role != Qt.DisplayRole:
+            return None
+        return self.headers[section] if orientation == Qt.Horizontal else section + 1
+
+    def flags(self, idx: QModelIndex):
+        if not idx.isValid():
+            return Qt.ItemIsEnabled
+        # read-only (edits happen in the form)
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def roleNames(self):
+        # Advertise the minimal role surface; consumers that honor it
+        # stop probing roles data() would reject anyway.
+        return {int(Qt.DisplayRole): b"display", int(Qt.EditRole): b"edit"}
+
+
+class SessionTableModel(QAbstractTableModel):
+    """Model backed by a list of SessionDTO for the Sessions tab."""
+    headers = ("Date", "Price", "Attended", "Notes")
+
+    def __init__(self, rows: List[SessionDTO] | None = None, parent=None):
+        super().__init__(parent)
+        self.rows: List[SessionDTO] = rows or []
+
+    def set_rows(self, rows: List[SessionDTO] | None):
+        self.beginResetModel()
+        self.rows = rows or []
+        self.endResetModel()
+
+    def at(self, row: int) -> SessionDTO:
+        return self.rows[row]
+
     def rowCount(self, parent=QModelIndex()) -> int:
         return 0 if parent.isValid() else len(self.rows)
 
@@ -32,33 +199,24 @@ class PatientTableModel(QAbstractTableModel):
         return 0 if parent.isValid() else len(self.headers)
 
     def data(self, idx: QModelIndex, role=Qt.DisplayRole):
+        if role not in _DISPLAY_ROLES:
+            return None
         if not idx.isValid() or idx.row() < 0 or idx.row() >= len(self.rows):
             return None
-        p = self.rows[idx.row()]
-        c = idx.column()
-
-        if role in (Qt.DisplayRole, Qt.EditRole):
-            return [
-                p.id,                                              # 0 ID (DB PK)
-                p.cin,                                             # 1 CIN (user key)
-                p.first_name,                                      # 2
-                p.last_name,                                       # 3
-                p.birth_date.isoformat() if p.birth_date else "",  # 4
-                p.phone or "",                                     # 5
-                p.email or "",                                     # 6
-                (p.notes or "")[:120],                             # 7
-            ][c]
-        return None
+        s = self.rows[idx.row()]
+        return [
+            s.session_date.isoformat() if s.session_date else "",
+            f"{s.price:.2f}",
+            "Yes" if s.attended else "No",
+            (s.notes or "")[:120],
+        ][idx.column()]
 
     def headerData(self, section: int, orientation, role=Qt.DisplayRole):
         if role != Qt.DisplayRole:
             return None
-        if orientation == Qt.Horizontal:
-            return self.headers[section]
-        return section + 1  # row header: 1-based
+        return self.headers[section] if orientation == Qt.Horizontal else section + 1
 
     def flags(self, idx: QModelIndex):
         if not idx.isValid():
             return Qt.ItemIsEnabled
-        # read-only (edits happen in the form)
         return Qt.ItemIsEnabled | Qt.ItemIsSelectable